@@ -21,6 +21,9 @@ Expects a CSV file at '../SQL/USDA_production_2023.csv' with columns:
     - commodity: Product type (Cheese, Coffee, Honey, Milk, Yogurt)
     - total_production: Production value in USD
 
+On first run the CSV is converted to '../SQL/USDA_production_2023.parquet',
+which is what later startups load.
+
 Usage:
 ------
     python app.py
@@ -32,23 +35,60 @@ Dependencies:
 Read the requirements.txt for full list, key packages include:
     - dash, dash-bootstrap-components, dash-ag-grid
     - dash-bootstrap-templates
-    - pandas, plotly
+    - pandas, polars, pyarrow, plotly, orjson
+    - flask-caching
 """
 
 from dash import jupyter_dash
 
 jupyter_dash.default_mode = "external"
 
+import os
+import tempfile
+from urllib.parse import urlencode
+
 import pandas as pd
+import polars as pl
 import plotly.express as px
-from dash import Dash, html, dcc, callback, Output, Input, State
+import plotly.io as pio
+from dash import Dash, html, dcc, callback, clientside_callback, no_update, Output, Input, State
 import dash_bootstrap_components as dbc
 import dash_ag_grid as dag
 from dash_bootstrap_templates import ThemeSwitchAIO, load_figure_template
+from flask import Response, request, stream_with_context
+from flask_caching import Cache
+
+# Dash serializes the layout and every callback response (figures, grid rowData)
+# through plotly's JSON encoder, so this one setting switches all of them to
+# orjson, which encodes numpy arrays directly instead of via Python objects
+pio.json.config.default_engine = "orjson"
 
 # Load data (long format: State, Year, commodity, total_production)
 DATA_PATH = "../SQL/USDA_production_2023.csv"
-df = pd.read_csv(DATA_PATH)
+# Explicit dtypes skip type inference; categoricals keep State/commodity as
+# small integer codes so isin/groupby hash codes rather than Python strings
+DATA_DTYPES = {
+    "State": "category",
+    "Year": "int32",
+    "commodity": "category",
+    "total_production": "float64",
+}
+# Parquet copy of the CSV, rebuilt whenever it is missing or older than the CSV
+PARQUET_PATH = DATA_PATH.replace(".csv", ".parquet")
+if not os.path.exists(PARQUET_PATH) or os.path.getmtime(PARQUET_PATH) < os.path.getmtime(DATA_PATH):
+    # Write to a temp file and rename it into place, so an interrupted write or
+    # a concurrently starting worker never sees a partial Parquet file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(PARQUET_PATH), suffix=".parquet.tmp")
+    os.close(fd)
+    try:
+        pd.read_csv(DATA_PATH, engine="pyarrow", dtype=DATA_DTYPES).to_parquet(tmp_path, compression="snappy")
+        os.replace(tmp_path, PARQUET_PATH)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+# The chart aggregations only need float32 precision, which halves the bytes
+# they read; the table and CSV export keep the exact float64 values (see usda_lazy)
+df = pd.read_parquet(PARQUET_PATH, columns=list(DATA_DTYPES)).astype({"total_production": "float32"})
 
 # Get unique values for filters
 states = sorted(df["State"].unique())
@@ -56,6 +96,41 @@ commodities = sorted(df["commodity"].unique())
 min_year = int(df["Year"].min())
 max_year = int(df["Year"].max())
 
+# National totals per commodity and year do not depend on any user input,
+# so aggregate once here and only slice them inside the line chart callback
+NATIONAL_WIDE = df.groupby(["commodity", "Year"], observed=True)["total_production"].sum().unstack("commodity")
+
+# Integer codes of each state and commodity, in category order
+STATE_CODE = {s: i for i, s in enumerate(df["State"].cat.categories)}
+COMMODITY_CODE = {c: i for i, c in enumerate(df["commodity"].cat.categories)}
+
+# Polars copy of the data for the table and CSV export queries, run as lazy
+# queries so filters, sorting and paging are planned and executed together.
+# State/commodity are Enums over the same categories, so their physical
+# values are the codes above and selections filter on small integers.
+usda_lazy = (
+    pl.read_parquet(PARQUET_PATH, columns=list(DATA_DTYPES))
+    .with_columns(
+        pl.col("State").cast(pl.Enum(list(STATE_CODE))),
+        pl.col("commodity").cast(pl.Enum(list(COMMODITY_CODE))),
+    )
+    .lazy()
+)
+
+# Per-year State x commodity production tables and the last year with data for
+# each commodity, so the bar chart never scans the full table
+BY_YEAR = {
+    year: group.pivot_table(
+        index="State", columns="commodity", values="total_production", aggfunc="sum", observed=True
+    )
+    for year, group in df.groupby("Year", sort=False)
+}
+LAST_YEAR_PER_COMMODITY = df.groupby("commodity", observed=True, sort=False)["Year"].max().astype(int).to_dict()
+
+# CSV export route (see download_csv) and the rows written per streamed chunk
+DOWNLOAD_FILENAME = "usda_production_filtered_data.csv"
+DOWNLOAD_CHUNK_ROWS = 1000
+
 # Theme configuration
 url_theme1 = dbc.themes.COSMO
 url_theme2 = dbc.themes.CYBORG
@@ -78,6 +153,10 @@ load_figure_template([template_theme1, template_theme2])
 app = Dash(__name__, external_stylesheets=[url_theme1, url_theme2])
 app.title = "USDA Production Dashboard"
 
+# Server-side cache for the data work behind each callback. The theme switch
+# is not part of any cache key, so toggling it never recomputes data.
+cache = Cache(app.server, config={"CACHE_TYPE": "SimpleCache", "CACHE_DEFAULT_TIMEOUT": 600})
+
 # Layout
 app.layout = dbc.Container(
     [
@@ -133,6 +212,9 @@ app.layout = dbc.Container(
                                 for y in range(min_year, max_year + 1, 10)
                             },
                             step=1,
+                            # Only report the value once a drag ends, so the charts and
+                            # table are not recomputed for every intermediate year
+                            updatemode="mouseup",
                             tooltip={"placement": "bottom", "always_visible": True},
                         ),
                     ],
@@ -187,29 +269,32 @@ app.layout = dbc.Container(
                                 html.Div(
                                     [
                                         html.H5("Filtered Data From Selected States", className="d-inline"),
+                                        # Plain link to the streaming CSV route; its
+                                        # href follows the current selection
                                         dbc.Button(
                                             "Download CSV",
                                             id="download-btn",
                                             color="primary",
                                             size="sm",
                                             className="float-end",
+                                            external_link=True,
+                                            download=DOWNLOAD_FILENAME,
                                         ),
                                     ]
                                 )
                             ),
-                            dcc.Download(id="download-csv"),
                             dbc.CardBody(
                                 dag.AgGrid(
                                     id="data-table",
                                     className="ag-theme-balham",
                                     columnDefs=[
-                                        {"field": "State", "sortable": True, "filter": True},
-                                        {"field": "Year", "sortable": True, "filter": True},
-                                        {"field": "commodity", "sortable": True, "filter": True},
+                                        {"field": "State", "sortable": True, "filter": "agTextColumnFilter"},
+                                        {"field": "Year", "sortable": True, "filter": "agNumberColumnFilter"},
+                                        {"field": "commodity", "sortable": True, "filter": "agTextColumnFilter"},
                                         {
                                             "field": "total_production",
                                             "sortable": True,
-                                            "filter": True,
+                                            "filter": "agNumberColumnFilter",
                                             "valueFormatter": {
                                                 "function": "d3.format(',.0f')(params.value)"
                                             },
@@ -217,17 +302,21 @@ app.layout = dbc.Container(
                                     ],
                                     defaultColDef={"resizable": True},
                                     style={"height": "400px"},
+                                    # Rows are fetched from the server one block at a time
+                                    # (see update_table) instead of shipping the full selection
+                                    rowModelType="infinite",
                                     dashGridOptions={
                                         "pagination": True,
                                         "paginationPageSize": 10,
+                                        "cacheBlockSize": 100,
                                     },
                                     getRowStyle={
                                         "styleConditions": [
-                                            {"condition": "params.data.commodity === 'Cheese'", "style": {"backgroundColor": "#636EFA", "color": "white"}},
-                                            {"condition": "params.data.commodity === 'Coffee'", "style": {"backgroundColor": "#EF553B", "color": "white"}},
-                                            {"condition": "params.data.commodity === 'Honey'", "style": {"backgroundColor": "#00CC96", "color": "white"}},
-                                            {"condition": "params.data.commodity === 'Milk'", "style": {"backgroundColor": "#AB63FA", "color": "white"}},
-                                            {"condition": "params.data.commodity === 'Yogurt'", "style": {"backgroundColor": "#FFA15A", "color": "white"}},
+                                            {"condition": "params.data && params.data.commodity === 'Cheese'", "style": {"backgroundColor": "#636EFA", "color": "white"}},
+                                            {"condition": "params.data && params.data.commodity === 'Coffee'", "style": {"backgroundColor": "#EF553B", "color": "white"}},
+                                            {"condition": "params.data && params.data.commodity === 'Honey'", "style": {"backgroundColor": "#00CC96", "color": "white"}},
+                                            {"condition": "params.data && params.data.commodity === 'Milk'", "style": {"backgroundColor": "#AB63FA", "color": "white"}},
+                                            {"condition": "params.data && params.data.commodity === 'Yogurt'", "style": {"backgroundColor": "#FFA15A", "color": "white"}},
                                         ]
                                     },
                                 )
@@ -239,11 +328,217 @@ app.layout = dbc.Container(
             ],
             className="mb-4",
         ),
+        # Both figure templates, so theme changes can be applied in the browser
+        dcc.Store(
+            id="figure-templates",
+            data={
+                template_theme1: pio.templates[template_theme1].to_plotly_json(),
+                template_theme2: pio.templates[template_theme2].to_plotly_json(),
+            },
+        ),
     ],
     fluid=True,
 )
 
 
+# =============================================================================
+# DATA HELPERS
+# =============================================================================
+# Memoized on normalized, hashable arguments: callers pass sorted tuples of
+# states/commodities and plain ints for years so equivalent selections share
+# a cache entry.
+
+
+@cache.memoize()
+def _line_data(start_year, end_year, selected_commodities):
+    """
+    Return national production by commodity and year for the line chart.
+
+    Args:
+        start_year: First year of the selected range (inclusive).
+        end_year: Last year of the selected range (inclusive).
+        selected_commodities: Sorted tuple of commodity names.
+
+    Returns:
+        pandas.DataFrame: Long-format frame with Year, commodity and total_production.
+    """
+    # Slice the precomputed national totals (columns kept in sorted order);
+    # NaN cells are commodity/year pairs with no data, not unobserved categories
+    columns = NATIONAL_WIDE.columns.intersection(selected_commodities)
+    return (
+        NATIONAL_WIDE.loc[start_year:end_year, columns]
+        .reset_index()
+        .melt(id_vars="Year", var_name="commodity", value_name="total_production")
+        .dropna(subset=["total_production"])
+    )
+
+
+@cache.memoize()
+def _bar_data(end_year, selected_commodities):
+    """
+    Return the top 10 state/commodity production rows for the bar chart.
+
+    Uses the most recent year of the selected range, falling back to the latest
+    year with data for the selected commodities.
+
+    Args:
+        end_year: Last year of the selected range.
+        selected_commodities: Sorted tuple of commodity names.
+
+    Returns:
+        tuple: (selected_year, pandas.DataFrame of the top 10 rows).
+    """
+    # Find the latest year with data for selected commodities
+    lastyear = max(LAST_YEAR_PER_COMMODITY[c] for c in selected_commodities)
+    if end_year > lastyear:
+        selected_year = lastyear
+    else:
+        selected_year = end_year
+
+    # Production by state for the selected commodities in that year
+    by_state = BY_YEAR[selected_year]
+    columns = by_state.columns.intersection(selected_commodities)
+    filtered_df = by_state[columns].stack().rename("total_production").reset_index()
+
+    # Drop states with no production of a commodity, the empty pivot cells
+    filtered_df = filtered_df.dropna(subset=["total_production"])
+    return selected_year, filtered_df.nlargest(10, "total_production")
+
+
+@cache.memoize()
+def _table_data(selected_states, start_year, end_year, selected_commodities):
+    """
+    Return the filtered and sorted production records for the table and CSV export.
+
+    Args:
+        selected_states: Sorted tuple of state names.
+        start_year: First year of the selected range (inclusive).
+        end_year: Last year of the selected range (inclusive).
+        selected_commodities: Sorted tuple of commodity names.
+
+    Returns:
+        polars.DataFrame: Matching rows sorted by state, year (descending) and commodity.
+    """
+    state_codes = [STATE_CODE[s] for s in selected_states if s in STATE_CODE]
+    commodity_codes = [COMMODITY_CODE[c] for c in selected_commodities if c in COMMODITY_CODE]
+    return (
+        usda_lazy.filter(
+            pl.col("State").to_physical().is_in(state_codes)
+            & pl.col("Year").is_between(start_year, end_year)
+            & pl.col("commodity").to_physical().is_in(commodity_codes)
+            & pl.col("total_production").is_not_null()
+        )
+        .sort(["State", "Year", "commodity"], descending=[False, True, False])
+        .collect()
+    )
+
+
+def _selected_rows(selected_states, year_range, selected_commodities):
+    """
+    Return the table rows for a selection, shared by the data table and CSV export.
+
+    Applies the dashboard's default states/commodities to empty selections and
+    normalizes the inputs, so both consumers hit the same _table_data cache entry.
+
+    Args:
+        selected_states: List of state names (empty or None for the default).
+        year_range: Sequence of [start_year, end_year].
+        selected_commodities: List of commodity names (empty or None for the default).
+
+    Returns:
+        polars.DataFrame: The memoized rows from _table_data.
+    """
+    if not selected_states:
+        selected_states = states[:3]
+
+    if not selected_commodities:
+        selected_commodities = ["Yogurt", "Honey"]
+
+    return _table_data(
+        tuple(sorted(selected_states)),
+        int(year_range[0]),
+        int(year_range[1]),
+        tuple(sorted(selected_commodities)),
+    )
+
+
+def _grid_condition_expr(field, condition):
+    """
+    Build a Polars filter expression for a single AG Grid text or number filter condition.
+
+    Args:
+        field: Name of the column the condition applies to.
+        condition: Filter condition dict from the grid's filterModel.
+
+    Returns:
+        polars.Expr: Boolean expression matching the condition.
+    """
+    column = pl.col(field)
+    kind = condition.get("type")
+    if kind == "blank":
+        return column.is_null()
+    if kind == "notBlank":
+        return column.is_not_null()
+
+    if condition.get("filterType") == "number":
+        value = condition.get("filter")
+        if kind == "inRange":
+            # The grid's inRange excludes both ends (inRangeInclusive is not set)
+            return column.is_between(value, condition.get("filterTo"), closed="none")
+        return {
+            "equals": column == value,
+            "notEqual": column != value,
+            "lessThan": column < value,
+            "lessThanOrEqual": column <= value,
+            "greaterThan": column > value,
+            "greaterThanOrEqual": column >= value,
+        }[kind]
+
+    # Text filters are case-insensitive, as in the grid itself
+    text = column.cast(pl.String).str.to_lowercase()
+    value = str(condition.get("filter", "")).lower()
+    return {
+        "contains": text.str.contains(value, literal=True),
+        "notContains": ~text.str.contains(value, literal=True),
+        "equals": text == value,
+        "notEqual": text != value,
+        "startsWith": text.str.starts_with(value),
+        "endsWith": text.str.ends_with(value),
+    }[kind]
+
+
+def _apply_grid_request(frame, rows_request):
+    """
+    Apply the column filters and sorting from an AG Grid getRowsRequest.
+
+    Args:
+        frame: polars.DataFrame of table rows.
+        rows_request: getRowsRequest dict with optional filterModel and sortModel.
+
+    Returns:
+        polars.DataFrame: The filtered and sorted rows.
+    """
+    query = frame.lazy()
+    for field, model in (rows_request.get("filterModel") or {}).items():
+        if "conditions" in model:
+            exprs = [_grid_condition_expr(field, c) for c in model["conditions"]]
+            if model.get("operator") == "OR":
+                query = query.filter(pl.any_horizontal(exprs))
+            else:
+                query = query.filter(pl.all_horizontal(exprs))
+        else:
+            query = query.filter(_grid_condition_expr(field, model))
+
+    sort_model = rows_request.get("sortModel") or []
+    if sort_model:
+        query = query.sort(
+            [s["colId"] for s in sort_model],
+            descending=[s["sort"] == "desc" for s in sort_model],
+            maintain_order=True,
+        )
+    return query.collect()
+
+
 # =============================================================================
 # CALLBACKS
 # =============================================================================
@@ -253,19 +548,21 @@ app.layout = dbc.Container(
     Output("line-chart", "figure"),
     Input("year-slider", "value"),
     Input("commodity-checklist", "value"),
-    Input(ThemeSwitchAIO.ids.switch("theme"), "value"),
+    State(ThemeSwitchAIO.ids.switch("theme"), "value"),
 )
 def update_line_chart(year_range, selected_commodities, toggle):
     """
     Update line chart showing national production trends over time.
 
-    Aggregates production data across all states by commodity and year,
-    displaying trends for selected commodities within the specified year range.
+    Uses the national totals precomputed at startup (summed across all states
+    by commodity and year), displaying trends for selected commodities within
+    the specified year range.
 
     Args:
         year_range: List of [start_year, end_year] from the range slider.
         selected_commodities: List of commodity names to display.
-        toggle: Boolean for theme selection (True=light, False=dark).
+        toggle: Current theme switch value (True=light, False=dark). Later theme
+            changes are applied client-side by the figure template callback.
 
     Returns:
         plotly.graph_objects.Figure: Line chart with markers showing production trends.
@@ -275,11 +572,7 @@ def update_line_chart(year_range, selected_commodities, toggle):
     if not selected_commodities:
         selected_commodities = ["Yogurt", "Honey"]
 
-    filtered_df = df[
-        (df["Year"] >= year_range[0])
-        & (df["Year"] <= year_range[1])
-        & (df["commodity"].isin(selected_commodities))
-    ].groupby(["commodity", "Year"])["total_production"].sum().reset_index().copy()
+    filtered_df = _line_data(int(year_range[0]), int(year_range[1]), tuple(sorted(selected_commodities)))
 
     title = f"<b>{', '.join(selected_commodities)} Production by Year"
 
@@ -311,7 +604,7 @@ def update_line_chart(year_range, selected_commodities, toggle):
     Output("bar-chart", "figure"),
     Input("year-slider", "value"),
     Input("commodity-checklist", "value"),
-    Input(ThemeSwitchAIO.ids.switch("theme"), "value"),
+    State(ThemeSwitchAIO.ids.switch("theme"), "value"),
 )
 def update_bar_chart(year_range, selected_commodities, toggle):
     """
@@ -324,7 +617,8 @@ def update_bar_chart(year_range, selected_commodities, toggle):
     Args:
         year_range: List of [start_year, end_year] from the range slider.
         selected_commodities: List of commodity names to include.
-        toggle: Boolean for theme selection (True=light, False=dark).
+        toggle: Current theme switch value (True=light, False=dark). Later theme
+            changes are applied client-side by the figure template callback.
 
     Returns:
         plotly.graph_objects.Figure: Grouped bar chart of top producing states.
@@ -334,21 +628,7 @@ def update_bar_chart(year_range, selected_commodities, toggle):
     if not selected_commodities:
         selected_commodities = ["Yogurt", "Honey"]
 
-    # Find the latest year with data for selected commodities
-    lastyear = int(df[df["commodity"].isin(selected_commodities)]["Year"].max())
-    if int(year_range[1]) > lastyear:
-        selected_year = lastyear
-    else:
-        selected_year = year_range[1]
-
-    # Aggregate production across selected commodities by state
-    filtered_df = df[
-        (df["Year"] == selected_year)
-        & (df["commodity"].isin(selected_commodities))
-    ].groupby(["State", "commodity"])["total_production"].sum().reset_index()
-
-    filtered_df = filtered_df.dropna(subset=["total_production"])
-    top_10 = filtered_df.nlargest(10, "total_production")
+    selected_year, top_10 = _bar_data(int(year_range[1]), tuple(sorted(selected_commodities)))
     commodity_label = ", ".join(selected_commodities)
     fig = px.bar(
         top_10,
@@ -369,90 +649,145 @@ def update_bar_chart(year_range, selected_commodities, toggle):
     return fig
 
 
-@callback(
-    Output("data-table", "rowData"),
+# Swap the template of the existing figures in the browser when the theme is
+# toggled, without a server round trip or rebuilding the figures
+clientside_callback(
+    """
+    function(toggle, lineFigure, barFigure, templates) {
+        const template = templates[toggle ? "%s" : "%s"];
+        const applyTemplate = (figure) => figure
+            ? {...figure, layout: {...figure.layout, template: template}}
+            : window.dash_clientside.no_update;
+        return [applyTemplate(lineFigure), applyTemplate(barFigure)];
+    }
+    """ % (template_theme1, template_theme2),
+    Output("line-chart", "figure", allow_duplicate=True),
+    Output("bar-chart", "figure", allow_duplicate=True),
+    Input(ThemeSwitchAIO.ids.switch("theme"), "value"),
+    State("line-chart", "figure"),
+    State("bar-chart", "figure"),
+    State("figure-templates", "data"),
+    prevent_initial_call=True,
+)
+
+
+# Drop the grid's cached blocks whenever the selection changes, so it requests
+# rows again from the first page
+clientside_callback(
+    """
+    async function(selectedStates, yearRange, selectedCommodities) {
+        const api = await dash_ag_grid.getApiAsync("data-table");
+        api.purgeInfiniteCache();
+        return "first";
+    }
+    """,
+    Output("data-table", "paginationGoTo"),
     Input("state-dropdown", "value"),
     Input("year-slider", "value"),
     Input("commodity-checklist", "value"),
+    prevent_initial_call=True,
+)
+
+
+@callback(
+    Output("data-table", "getRowsResponse"),
+    Input("data-table", "getRowsRequest"),
+    State("state-dropdown", "value"),
+    State("year-slider", "value"),
+    State("commodity-checklist", "value"),
 )
-def update_table(selected_states, year_range, selected_commodities):
+def update_table(rows_request, selected_states, year_range, selected_commodities):
     """
-    Update the data table with filtered production records.
+    Serve one block of filtered production records to the data table.
 
     Filters the dataset by selected states, year range, and commodities,
-    then sorts results by state (ascending), year (descending), and commodity.
+    sorted by state (ascending), year (descending), and commodity unless the
+    grid requests its own sort, then applies the grid's column filters and
+    returns only the rows between startRow and endRow.
 
     Args:
+        rows_request: getRowsRequest dict from the grid's infinite row model.
         selected_states: List of state names to include in the table.
         year_range: List of [start_year, end_year] from the range slider.
         selected_commodities: List of commodity names to include.
 
     Returns:
-        list[dict]: List of row dictionaries for the AG Grid table.
+        dict: getRowsResponse with the requested rowData and the total rowCount.
     """
-    if not selected_states:
-        selected_states = states[:3]
+    if not rows_request:
+        return no_update
 
-    if not selected_commodities:
-        selected_commodities = ["Yogurt", "Honey"]
-
-    filtered_df = df[
-        (df["State"].isin(selected_states))
-        & (df["Year"] >= year_range[0])
-        & (df["Year"] <= year_range[1])
-        & (df["commodity"].isin(selected_commodities))
-    ].copy()
-
-    filtered_df = filtered_df.dropna(subset=["total_production"])
-    filtered_df = filtered_df.sort_values(["State", "Year", "commodity"], ascending=[True, False, True])
+    filtered_df = _selected_rows(selected_states, year_range, selected_commodities)
+    filtered_df = _apply_grid_request(filtered_df, rows_request)
 
-    return filtered_df.to_dict("records")
+    start_row = rows_request["startRow"]
+    page = filtered_df.slice(start_row, rows_request["endRow"] - start_row)
+    return {"rowData": page.to_dicts(), "rowCount": filtered_df.height}
 
 
 @callback(
-    Output("download-csv", "data"),
-    Input("download-btn", "n_clicks"),
-    State("state-dropdown", "value"),
-    State("year-slider", "value"),
-    State("commodity-checklist", "value"),
-    prevent_initial_call=True,
+    Output("download-btn", "href"),
+    Input("state-dropdown", "value"),
+    Input("year-slider", "value"),
+    Input("commodity-checklist", "value"),
 )
-def download_csv(n_clicks, selected_states, year_range, selected_commodities):
+def update_download_link(selected_states, year_range, selected_commodities):
     """
-    Generate and download filtered data as a CSV file.
-
-    Triggered by the Download CSV button click. Applies the same filters
-    as the data table and exports the results to a downloadable CSV file.
+    Point the Download CSV button at the export route for the current filters.
 
     Args:
-        n_clicks: Number of times the download button has been clicked.
-        selected_states: List of state names from the dropdown (State).
-        year_range: List of [start_year, end_year] from the slider (State).
-        selected_commodities: List of commodity names from checklist (State).
+        selected_states: List of state names from the dropdown.
+        year_range: List of [start_year, end_year] from the slider.
+        selected_commodities: List of commodity names from checklist.
 
     Returns:
-        dict: Download data object with CSV content, or None if not triggered.
+        str: Relative URL of the CSV export with the filters as query parameters.
     """
-    if not n_clicks:
-        return None
+    query = urlencode(
+        {
+            "state": selected_states or [],
+            "start": year_range[0],
+            "end": year_range[1],
+            "commodity": selected_commodities or [],
+        },
+        doseq=True,
+    )
+    return app.get_relative_path(f"/download/{DOWNLOAD_FILENAME}") + "?" + query
 
-    if not selected_states:
-        selected_states = states[:3]
 
-    if not selected_commodities:
-        selected_commodities = ["Yogurt", "Honey"]
+# =============================================================================
+# ROUTES
+# =============================================================================
 
-    filtered_df = df[
-        (df["State"].isin(selected_states))
-        & (df["Year"] >= year_range[0])
-        & (df["Year"] <= year_range[1])
-        & (df["commodity"].isin(selected_commodities))
-    ].copy()
 
-    filtered_df = filtered_df.dropna(subset=["total_production"])
-    filtered_df = filtered_df.sort_values(["State", "Year", "commodity"], ascending=[True, False, True])
+@app.server.route(f"/download/{DOWNLOAD_FILENAME}")
+def download_csv():
+    """
+    Stream the filtered data as a CSV file.
+
+    Reads the filters from the query string built by update_download_link,
+    applies the same filters as the data table, and writes the rows in
+    chunks of DOWNLOAD_CHUNK_ROWS so the whole CSV is never held in memory.
+
+    Returns:
+        flask.Response: Streaming text/csv attachment response.
+    """
+    filtered_df = _selected_rows(
+        request.args.getlist("state"),
+        (request.args.get("start", min_year, type=int), request.args.get("end", max_year, type=int)),
+        request.args.getlist("commodity"),
+    )
 
-    return dcc.send_data_frame(filtered_df.to_csv, "usda_production_filtered_data.csv", index=False)
+    def generate():
+        yield filtered_df.head(0).write_csv()
+        for offset in range(0, filtered_df.height, DOWNLOAD_CHUNK_ROWS):
+            yield filtered_df.slice(offset, DOWNLOAD_CHUNK_ROWS).write_csv(include_header=False)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={DOWNLOAD_FILENAME}"},
+    )
 
 
 if __name__ == "__main__":